@@ -1,22 +1,26 @@
-from fastapi import FastAPI, HTTPException, status, Query
+from fastapi import FastAPI, HTTPException, status, Query, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi import Request
 import os
 import json
 import logging
-import re
+import hashlib
+import time
 import urllib.parse
+import functools
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 from azure.identity import DefaultAzureCredential, CredentialUnavailableError
 from azure.mgmt.resource import ResourceManagementClient, SubscriptionClient
 from azure.mgmt.storage import StorageManagementClient
 from azure.mgmt.compute import ComputeManagementClient
 from azure.mgmt.web import WebSiteManagementClient
-from azure.core.exceptions import ResourceExistsError, ClientAuthenticationError
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError, ClientAuthenticationError
 from fastapi.exception_handlers import RequestValidationError
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -25,12 +29,39 @@ from pydantic import BaseModel, Field
 # Additional imports needed
 import subprocess
 import shutil
+import queue
+import threading
+import asyncio
+import aiofiles
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson is an optional, much faster drop-in for the stdlib json module
+def _loads(data):
+    if orjson:
+        # Malformed input raises orjson.JSONDecodeError, a json.JSONDecodeError
+        # subclass, so callers handle both backends the same way
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+def _dumps(obj) -> str:
+    return orjson.dumps(obj).decode() if orjson else json.dumps(obj)
+
+# Response class for every JSON reply, including the exception handlers
+_JSONResponse = ORJSONResponse if orjson else JSONResponse
 
 # Define a model for the parameter value structure
 class ParameterValue(BaseModel):
     value: Any
 
 # Utility functions (inline instead of importing from utils)
+# The az location does not change while the app runs; failures are not cached
+@functools.lru_cache(maxsize=1)
 def get_azure_cli_path():
     az_path = shutil.which('az')
     if not az_path:
@@ -42,62 +73,94 @@ def get_azure_cli_path():
                 raise Exception("Azure CLI not found. Please ensure it is installed and in your PATH.")
     return az_path
 
-def run_azure_cli_command(command, subscription_id: str | None = None):
-    try:
-        full_command = []
-        az_path = get_azure_cli_path()
+# Skip the CLI's telemetry upload and warning chatter; neither is used here
+_AZURE_CLI_ENV_OVERRIDES = {
+    "AZURE_CORE_COLLECT_TELEMETRY": "false",
+    "AZURE_CORE_ONLY_SHOW_ERRORS": "true",
+}
+
+def _azure_cli_env():
+    return {**os.environ, **_AZURE_CLI_ENV_OVERRIDES}
+
+def _build_azure_cli_command(command, subscription_id: str | None = None):
+    full_command = []
+    az_path = get_azure_cli_path()
+
+    # Always start with the az executable path
+    full_command.append(az_path)
+
+    if command[0] == 'bicep':
+        # For bicep commands, add 'bicep' as the second argument
+        full_command.append('bicep')
+        # Add the rest of the command arguments as they are
+        full_command.extend(command[1:])
+    else:
+        # For other az commands, add the rest of the command arguments
+        if subscription_id:
+            full_command.extend(["--subscription", subscription_id])
+        full_command.extend(command)
+    return full_command
+
+# Only this much of the CLI's stdout is decoded into the info log
+_CLI_LOG_PREVIEW_BYTES = 2048
 
-        # Always start with the az executable path
-        full_command.append(az_path)
+def _parse_azure_cli_output(stdout: bytes, stderr: bytes, returncode: int):
+    # Work on the raw bytes; only the JSON part itself needs to reach the parser
+    out = stdout.strip()
+    err = stderr.decode("utf-8", "replace").strip()
 
-        if command[0] == 'bicep':
-            # For bicep commands, add 'bicep' as the second argument
-            full_command.append('bicep')
-            # Add the rest of the command arguments as they are
-            full_command.extend(command[1:])
+    if out:
+        if len(out) > _CLI_LOG_PREVIEW_BYTES:
+            preview = out[:_CLI_LOG_PREVIEW_BYTES].decode('utf-8', 'replace')
+            logging.info(f"Azure CLI command stdout ({len(out)} bytes, truncated): {preview}...")
         else:
-            # For other az commands, add the rest of the command arguments
-            if subscription_id:
-                full_command.extend(["--subscription", subscription_id])
-            full_command.extend(command)
+            logging.info(f"Azure CLI command stdout: {out.decode('utf-8', 'replace')}")
+    if err:
+        logging.error("Azure CLI command stderr: %s", err)
 
-        logging.info(f"Running Azure CLI command: {' '.join(full_command)}")
-        result = subprocess.run(full_command, capture_output=True, text=True, shell=False)
-
-        if result.stdout:
-            logging.info(f"Azure CLI command stdout: {result.stdout.strip()}")
-        if result.stderr:
-            logging.error(f"Azure CLI command stderr: {result.stderr.strip()}")
-
-        if result.returncode == 0 and result.stdout.strip():
-            stdout_str = result.stdout.strip()
-            json_start = -1
-            json_end = -1
-            array_start = stdout_str.find('[')
-            object_start = stdout_str.find('{')
-            if array_start != -1 and (object_start == -1 or array_start < object_start):
-                json_start = array_start
-                json_end = stdout_str.rfind(']')
-            elif object_start != -1:
-                json_start = object_start
-                json_end = stdout_str.rfind('}')
-            if json_start != -1 and json_end != -1 and json_end > json_start:
-                json_string = stdout_str[json_start : json_end + 1]
-                try:
-                    return json.loads(json_string), result.returncode
-                except json.JSONDecodeError:
-                    logging.error(f"Failed to parse extracted JSON string: {json_string}")
-                    return stdout_str, result.returncode
-            else:
-                logging.warning("No JSON structure found in Azure CLI stdout. Returning raw output and return code.")
-                return stdout_str, result.returncode
+    if returncode == 0 and out:
+        # az normally prints bare JSON; only search for it when text precedes it
+        if out[:1] in (b'[', b'{'):
+            json_start = 0
         else:
-            return result.stderr.strip(), result.returncode
-    except subprocess.SubprocessError as e:
-        logging.error(f"Error executing Azure CLI command: {e}")
+            json_start = min((i for i in (out.find(b'['), out.find(b'{')) if i != -1), default=-1)
+        if json_start != -1:
+            try:
+                # Fast path: the JSON value runs to the end of the output
+                return _loads(memoryview(out)[json_start:]), returncode
+            except json.JSONDecodeError:
+                pass
+            json_text = out[json_start:].decode("utf-8", "replace")
+            try:
+                # Otherwise decode the first JSON value and ignore whatever follows it
+                return json.JSONDecoder().raw_decode(json_text)[0], returncode
+            except json.JSONDecodeError:
+                logging.error("Failed to parse extracted JSON string: %s", json_text)
+                return out.decode("utf-8", "replace"), returncode
+        else:
+            logging.warning("No JSON structure found in Azure CLI stdout. Returning raw output and return code.")
+            return out.decode("utf-8", "replace"), returncode
+    else:
+        return err, returncode
+
+async def run_azure_cli_command_async(command, subscription_id: str | None = None):
+    """Run an Azure CLI command without blocking the event loop while az runs."""
+    try:
+        full_command = _build_azure_cli_command(command, subscription_id)
+        logging.info(f"Running Azure CLI command: {' '.join(full_command)}")
+        proc = await asyncio.create_subprocess_exec(
+            *full_command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=_azure_cli_env()
+        )
+        stdout, stderr = await proc.communicate()
+        return _parse_azure_cli_output(stdout, stderr, proc.returncode)
+    except (OSError, subprocess.SubprocessError) as e:
+        logging.error("Error executing Azure CLI command: %s", e)
         return f"Error executing Azure CLI command: {str(e)}", 1
     except Exception as e:
-        logging.error(f"An unexpected error occurred while running Azure CLI command: {e}")
+        logging.error("An unexpected error occurred while running Azure CLI command: %s", e)
         return f"An unexpected error occurred: {str(e)}", 1
 
 # Configure logging
@@ -112,38 +175,128 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Parameters supplied by the deployment request itself rather than the template form
+_SKIPPED_PARAMS = frozenset(("location", "resourceGroup"))
+
+def _bracket_balance(text: str, depth: int = 0) -> tuple[int, int]:
+    """
+    Follow ([{ nesting through text starting at depth, skipping quoted strings
+    (and their \\' escapes). Returns the depth reached and the index just past
+    the bracket that closed everything, or len(text) if nothing did.
+    """
+    quote = None
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if quote:
+            if ch == "\\":
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch in "([{":
+            depth += 1
+        elif ch in ")]}":
+            depth -= 1
+            if depth <= 0:
+                return depth, i + 1
+        i += 1
+    return depth, len(text)
+
 def parse_bicep_parameters(content: str, include_metadata: bool = False):
     """
     Parse parameters from Bicep template content.
     Returns a list of parameter definitions or dict if include_metadata is True.
+
+    Decorators such as @secure() and @description(...) apply to the next
+    declaration, whether they sit on the same line or on the lines above it,
+    so the scanner remembers them until that declaration.
     """
-    if include_metadata:
-        params = {}
-        param_pattern = re.compile(r'^\s*(@secure\(\)\s*)?(@description\(\s*[\'"]([^\'"]*)[\'"]?\s*\)\s*)?(param\s+)(\w+)\s+(\w+)(?:\s*=\s*(.*))?$', re.MULTILINE)
-    else:
-        params = []
-        param_pattern = re.compile(r'^\s*(@secure\(\)\s*)?(param\s+)(\w+)\s+(\w+)(?:\s*=\s*(.*))?$', re.MULTILINE)
-    
-    for match in param_pattern.finditer(content):
-        if include_metadata:
-            is_secure = match.group(1) is not None
-            description = match.group(3) if match.group(3) else ""
-            param_name = match.group(5)
-            param_type = match.group(6)
-            default_value_content = match.group(7)
-        else:
-            is_secure = match.group(1) is not None
-            param_name = match.group(3)
-            param_type = match.group(4)
-            default_value_content = match.group(5)
-        
+    params = {} if include_metadata else []
+    pending_secure = False
+    pending_desc = ""
+    decorator_depth = 0
+
+    for line in content.splitlines():
+        stripped = line.strip()
+
+        if decorator_depth > 0:
+            if stripped.startswith("param "):
+                # An unclosed decorator must not swallow the rest of the template
+                decorator_depth = 0
+            else:
+                # Still inside a multi-line decorator such as @allowed([ ... ])
+                decorator_depth, end = _bracket_balance(stripped, decorator_depth)
+                if decorator_depth > 0:
+                    continue
+                stripped = stripped[end:].lstrip()
+
+        # Consume each decorator's name and balanced (...) so that a declaration
+        # on the same line ("@secure() param p string") is still parsed below
+        while stripped.startswith("@"):
+            name_end = 1
+            while name_end < len(stripped) and (stripped[name_end].isalnum() or stripped[name_end] in "_."):
+                name_end += 1
+            name = stripped[1:name_end]
+            stripped = stripped[name_end:].lstrip()
+            arguments = ""
+            if stripped.startswith("("):
+                decorator_depth, end = _bracket_balance(stripped)
+                arguments, stripped = stripped[:end], stripped[end:].lstrip()
+            if name in ("secure", "sys.secure"):
+                pending_secure = True
+            elif name in ("description", "sys.description"):
+                quote_start = min((i for i in (arguments.find("'"), arguments.find('"')) if i != -1), default=-1)
+                if quote_start != -1:
+                    quote = arguments[quote_start]
+                    quote_end = quote_start + 1
+                    while quote_end < len(arguments) and arguments[quote_end] != quote:
+                        quote_end += 2 if arguments[quote_end] == "\\" else 1
+                    pending_desc = arguments[quote_start + 1:quote_end].replace("\\" + quote, quote)
+            if decorator_depth > 0:
+                break
+
+        if decorator_depth > 0 or not stripped:
+            continue
+
+        if not stripped.startswith("param "):
+            # Decorators only apply to the declaration right below them, so any
+            # other non-blank line (type, func, import, var, ...) discards them
+            if stripped:
+                pending_secure = False
+                pending_desc = ""
+            continue
+
+        # Split off the default first: Bicep allows "param a string='x'" without spaces
+        declaration, has_default, default_value_content = stripped.partition("=")
+        parts = declaration.split()
+        is_secure = pending_secure
+        description = pending_desc
+        pending_secure = False
+        pending_desc = ""
+
+        if len(parts) < 3 or parts[1] in _SKIPPED_PARAMS:
+            continue
+
+        param_name = parts[1]
+        param_type = parts[2]
+        if not has_default:
+            default_value_content = None
+
         default_value = None
-        
+
         if default_value_content is not None:
             stripped_value = default_value_content.strip()
-            if stripped_value:
+            if stripped_value.startswith("'''"):
+                # Multi-line Bicep strings: drop every surrounding quote
+                default_value = stripped_value.strip("'\"")
+            elif len(stripped_value) > 1 and stripped_value[0] in "'\"" and stripped_value[-1] == stripped_value[0]:
+                # Quoted Bicep strings (usually single-quoted, so not JSON) need no parser
+                default_value = stripped_value[1:-1]
+            elif stripped_value:
                 try:
-                    default_value = json.loads(stripped_value)
+                    default_value = orjson.loads(stripped_value) if orjson else json.loads(stripped_value)
                     if isinstance(default_value, str):
                         default_value = default_value.strip("'\"")
                 except json.JSONDecodeError:
@@ -151,29 +304,38 @@ def parse_bicep_parameters(content: str, include_metadata: bool = False):
                 except Exception as e:
                     logger.warning(f"Error parsing default value '{stripped_value}': {str(e)}")
                     default_value = stripped_value
-        
+
         if is_secure and param_type.lower() == 'string':
             param_type = 'securestring'
-        
-        if param_name not in ["location", "resourceGroup"]:
-            if include_metadata:
-                params[param_name] = {
-                    "type": param_type,
-                    "defaultValue": default_value,
-                    "metadata": {
-                        "description": description
-                    }
+
+        if include_metadata:
+            params[param_name] = {
+                "type": param_type,
+                "defaultValue": default_value,
+                "metadata": {
+                    "description": description
                 }
-            else:
-                params.append({
-                    "name": param_name,
-                    "type": param_type,
-                    "default": default_value
-                })
+            }
+        else:
+            params.append({
+                "name": param_name,
+                "type": param_type,
+                "default": default_value
+            })
     
     return params
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resolve the default subscription in the background so the first request
+    # without subscription_id does not pay for it; startup is not delayed
+    if credential:
+        threading.Thread(target=_prewarm_default_subscription, name="subscription-prewarm", daemon=True).start()
+    yield
+    await asyncio.to_thread(_stop_deployment_log_writer)
+    _close_azure_clients()
+
+app = FastAPI(lifespan=lifespan, default_response_class=_JSONResponse)
 
 # CORS configuration
 app.add_middleware(
@@ -191,6 +353,76 @@ except CredentialUnavailableError as e:
     print(f"Error initializing Azure credentials: {str(e)}")
     credential = None
 
+# Azure SDK clients are reused across requests so they share the credential's
+# token cache and their HTTP connection pools. subscription_id comes from the
+# request, so at most _RM_CLIENTS_MAX are kept: the least recently used one is
+# closed when a new one is needed, and the rest are closed on shutdown
+_RM_CLIENTS_MAX = 32
+_rm_clients: "OrderedDict[str, ResourceManagementClient]" = OrderedDict()
+_rm_clients_lock = threading.Lock()
+
+def _rm_client(sub_id: str) -> ResourceManagementClient:
+    evicted = None
+    with _rm_clients_lock:
+        client = _rm_clients.get(sub_id)
+        if client is not None:
+            _rm_clients.move_to_end(sub_id)
+            return client
+        client = _rm_clients[sub_id] = ResourceManagementClient(credential, sub_id)
+        if len(_rm_clients) > _RM_CLIENTS_MAX:
+            _, evicted = _rm_clients.popitem(last=False)
+    if evicted is not None:
+        try:
+            evicted.close()
+        except Exception as e:
+            logger.warning("Error closing Azure client: %s", e)
+    return client
+
+_sub_client = None
+
+def _subscription_client() -> SubscriptionClient:
+    global _sub_client
+    if _sub_client is None:
+        _sub_client = SubscriptionClient(credential)
+    return _sub_client
+
+# Subscription used when a request omits subscription_id: AZURE_SUBSCRIPTION_ID
+# if set, otherwise the first subscription the credential can see (not the one
+# picked with `az account set`), refreshed after _DEFAULT_SUB_TTL seconds
+_DEFAULT_SUB_TTL = 3600
+_DEFAULT_SUB_ID: str | None = None
+_DEFAULT_SUB_EXPIRES = 0.0
+
+def _default_subscription_id() -> str | None:
+    global _DEFAULT_SUB_ID, _DEFAULT_SUB_EXPIRES
+    env_sub_id = os.environ.get("AZURE_SUBSCRIPTION_ID")
+    if env_sub_id:
+        return env_sub_id
+    if _DEFAULT_SUB_ID is None or time.monotonic() >= _DEFAULT_SUB_EXPIRES:
+        first = next(iter(_subscription_client().subscriptions.list()), None)
+        _DEFAULT_SUB_ID = first.subscription_id if first is not None else None
+        _DEFAULT_SUB_EXPIRES = time.monotonic() + _DEFAULT_SUB_TTL
+    return _DEFAULT_SUB_ID
+
+def current_subscription_id(subscription_id: str | None = None) -> str:
+    """
+    Dependency resolving the ?subscription_id= query parameter, falling back to the cached default.
+    Declared sync so FastAPI runs the (possibly blocking) SDK lookup in its threadpool.
+    """
+    if not credential:
+        raise HTTPException(status_code=500, detail="Azure credentials not initialized.")
+    if subscription_id:
+        return subscription_id
+    try:
+        default_id = _default_subscription_id()
+    except Exception as sdk_e:
+        logger.error("Error getting default subscription: %s", sdk_e)
+        raise HTTPException(status_code=500, detail=f"Could not determine default subscription: {str(sdk_e)}")
+    if not default_id:
+        raise HTTPException(status_code=400, detail="Subscription ID is required or the credential must have access to at least one subscription.")
+    logger.info(f"Using default subscription: {default_id}")
+    return default_id
+
 # Absolute paths for static and template directories
 FRONTEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend"))
 TEMPLATES_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend"))
@@ -214,80 +446,147 @@ logger.info(f"Backend started. Static dir: {FRONTEND_DIR}, Templates dir: {TEMPL
 logger.info(f"CSS directory: {CSS_DIR if os.path.exists(CSS_DIR) else 'Not found'}")
 logger.info(f"JS directory: {JS_DIR if os.path.exists(JS_DIR) else 'Not found'}")
 
+def _close_azure_clients():
+    global _sub_client
+    with _rm_clients_lock:
+        clients = list(_rm_clients.values())
+        _rm_clients.clear()
+    if _sub_client is not None:
+        clients.append(_sub_client)
+        _sub_client = None
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            logger.warning("Error closing Azure client: %s", e)
+
+def _prewarm_default_subscription():
+    try:
+        logger.info(f"Default subscription: {_default_subscription_id()}")
+    except Exception as e:
+        logger.warning("Could not prewarm default subscription: %s", e)
+
 @app.get("/")
 async def read_root(request: Request):
     try:
         return templates.TemplateResponse("index.html", {"request": request})
     except Exception as e:
-        logger.error(f"Error rendering index.html: {str(e)}")
-        return JSONResponse(status_code=500, content={"message": "Failed to render index.html", "detail": str(e)})
+        logger.error("Error rendering index.html: %s", e, exc_info=True)
+        return _JSONResponse(status_code=500, content={"message": "Failed to render index.html", "detail": str(e)})
+
+# Icons shown in the UI for each known template (keyed by lowercased template name)
+_ICON_MAP = {
+    "aks": "boxes",
+    "cosmos db": "server",
+    "diagnostic settings": "gear",
+    "function app": "code-slash",
+    "keyvault": "lock",
+    "load balancer": "share",
+    "log analytics": "graph-up-arrow",
+    "nsg": "shield-check",
+    "public ip": "diagram-3",
+    "sql": "server",
+    "storage account": "hdd-stack",
+    "virtual machine ss": "pc-display",
+    "virtual machine": "pc-display",
+    "virtual network": "diagram-3",
+    "web app": "globe",
+}
+
+# Templates larger than this are parsed in a worker thread to keep the event loop free
+_PARSE_IN_THREAD_CHARS = 256 * 1024
+
+async def _read_template(path: str) -> str:
+    async with aiofiles.open(path, "r") as f:
+        return await f.read()
+
+async def _parse_template(content: str, include_metadata: bool = False):
+    if len(content) > _PARSE_IN_THREAD_CHARS:
+        return await asyncio.to_thread(parse_bicep_parameters, content, include_metadata)
+    return parse_bicep_parameters(content, include_metadata)
+
+# Parsed /templates response, reused while no .bicep file has been added, removed or modified
+_TEMPLATES_CACHE = {"sig": None, "data": None}
+
+# Template responses only change when a .bicep file does, so browsers may
+# revalidate them with If-None-Match against an ETag built from file stats
+_TEMPLATES_CACHE_CONTROL = "private, max-age=60"
+
+# Part of every ETag; bump it whenever template parsing or the response shape
+# changes, so browsers holding an ETag from an older server refetch
+_TEMPLATES_ETAG_VERSION = 2
+
+def _etag(sig) -> str:
+    return '"' + hashlib.blake2b(str((_TEMPLATES_ETAG_VERSION, sig)).encode(), digest_size=8).hexdigest() + '"'
+
+def _not_modified(request: Request, etag: str):
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _TEMPLATES_CACHE_CONTROL})
+    return None
+
+def _cacheable_response(content, etag: str) -> Response:
+    return _JSONResponse(content=content, headers={"ETag": etag, "Cache-Control": _TEMPLATES_CACHE_CONTROL})
 
 # Routes
 @app.get("/templates")
-async def get_templates():
+async def get_templates(request: Request):
     logger.info("/templates endpoint called")
     templates_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
     templates = []
     if not os.path.exists(templates_dir):
-        logger.error(f"Templates directory not found at {templates_dir}")
+        logger.error("Templates directory not found at %s", templates_dir)
         return []
-    for filename in os.listdir(templates_dir):
-        if filename.endswith(".bicep"):
-            template_name = filename.replace(".bicep", "")
-            template_path = os.path.join(templates_dir, filename)
-            try:
-                with open(template_path, "r") as f:
-                    content = f.read()
-                params = parse_bicep_parameters(content)
-                icon_name = "file-earmark"
-                template_name_lower = template_name.lower()
-                if template_name_lower == "aks":
-                    icon_name = "boxes"
-                elif template_name_lower == "cosmos db":
-                    icon_name = "server"
-                elif template_name_lower == "diagnostic settings":
-                    icon_name = "gear"
-                elif template_name_lower == "function app":
-                    icon_name = "code-slash"
-                elif template_name_lower == "keyvault":
-                    icon_name = "lock"
-                elif template_name_lower == "load balancer":
-                    icon_name = "share"
-                elif template_name_lower == "log analytics":
-                    icon_name = "graph-up-arrow"
-                elif template_name_lower == "nsg":
-                    icon_name = "shield-check"
-                elif template_name_lower == "public ip":
-                    icon_name = "diagram-3"
-                elif template_name_lower == "sql":
-                    icon_name = "server"
-                elif template_name_lower == "storage account":
-                    icon_name = "hdd-stack"
-                elif template_name_lower == "virtual machine ss":
-                    icon_name = "pc-display"
-                elif template_name_lower == "virtual machine":
-                    icon_name = "pc-display"
-                elif template_name_lower == "virtual network":
-                    icon_name = "diagram-3"
-                elif template_name_lower == "web app":
-                    icon_name = "globe"
-                templates.append({
-                    "template": template_name,
-                    "params": params,
-                    "icon": icon_name
-                })
-                logger.info(f"Backend sending icon '{icon_name}' for template '{template_name}'.")
-            except FileNotFoundError:
-                logger.warning(f"Template file not found: {template_path}")
-                continue
-            except Exception as e:
-                logger.error(f"Error processing template file {filename}: {str(e)}")
+    entries = []
+    with os.scandir(templates_dir) as it:
+        for entry in it:
+            if not entry.name.endswith(".bicep"):
                 continue
+            entries.append((entry.name, entry.path, entry.stat()))
+    sig = tuple(sorted((name, st.st_mtime_ns, st.st_size) for name, _, st in entries))
+    etag = _etag(sig)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        logger.info("/templates endpoint returning 304 Not Modified")
+        return not_modified
+    if sig == _TEMPLATES_CACHE["sig"]:
+        logger.info(f"/templates endpoint returning {len(_TEMPLATES_CACHE['data'])} cached templates")
+        return _cacheable_response(_TEMPLATES_CACHE["data"], etag)
+    filenames = [name for name, _, _ in entries]
+    paths = [path for _, path, _ in entries]
+    contents = await asyncio.gather(*[_read_template(p) for p in paths], return_exceptions=True)
+    failed = False
+    for filename, template_path, content in zip(filenames, paths, contents):
+        template_name = filename.replace(".bicep", "")
+        try:
+            if isinstance(content, BaseException):
+                raise content
+            params = await _parse_template(content)
+            icon_name = _ICON_MAP.get(template_name.lower(), "file-earmark")
+            templates.append({
+                "template": template_name,
+                "params": params,
+                "icon": icon_name
+            })
+            logger.info(f"Backend sending icon '{icon_name}' for template '{template_name}'.")
+        except FileNotFoundError:
+            logger.warning(f"Template file not found: {template_path}")
+            failed = True
+            continue
+        except Exception as e:
+            logger.error("Error processing template file %s: %s", filename, e, exc_info=True)
+            failed = True
+            continue
     logger.info(f"/templates endpoint returning {len(templates)} templates")
-    return templates
+    if failed:
+        # A failure need not change mtime/size (e.g. a chmod fix), so an incomplete
+        # list is neither cached nor given an ETag the client could revalidate with
+        return templates
+    _TEMPLATES_CACHE["sig"] = sig
+    _TEMPLATES_CACHE["data"] = templates
+    return _cacheable_response(templates, etag)
 
 @app.get("/templates/{template_name}/parameters")
-async def get_template_parameters(template_name: str):
+async def get_template_parameters(template_name: str, request: Request):
     """
     Get parameters for a specific template.
     Returns the parameter definitions for the specified Bicep template.
@@ -302,23 +601,75 @@ async def get_template_parameters(template_name: str):
     template_path = os.path.join(templates_dir, f"{template_name}.bicep")
     
     if not os.path.exists(template_path):
-        logger.error(f"Template file not found: {template_path}")
+        logger.error("Template file not found: %s", template_path)
         raise HTTPException(status_code=404, detail=f"Template '{template_name}' not found")
     
+    st = os.stat(template_path)
+    etag = _etag((template_name, st.st_mtime_ns, st.st_size))
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        logger.info(f"Parameters for template '{template_name}' not modified")
+        return not_modified
+    
     try:
-        with open(template_path, "r") as f:
-            content = f.read()
+        content = await _read_template(template_path)
         
         # Parse parameters from the Bicep template
-        params = parse_bicep_parameters(content, include_metadata=True)
+        params = await _parse_template(content, include_metadata=True)
         
         logger.info(f"Returning {len(params)} parameters for template '{template_name}'")
-        return params
+        return _cacheable_response(params, etag)
         
     except Exception as e:
-        logger.error(f"Error processing template file {template_path}: {str(e)}")
+        logger.error("Error processing template file %s: %s", template_path, e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error processing template: {str(e)}")
 
+# Deployment records are appended to logs/deployments.log by a background
+# thread so the request handlers never touch the file themselves; the thread
+# is started on first use and flushed and stopped on shutdown
+_log_queue = queue.SimpleQueue()
+_LOG_STOP = object()
+_log_writer: threading.Thread | None = None
+_log_writer_lock = threading.Lock()
+
+def _drain_deployment_log():
+    stopping = False
+    while not stopping:
+        batch = [_log_queue.get()]
+        try:
+            while True:
+                batch.append(_log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if _LOG_STOP in batch:
+            stopping = True
+            batch = [record for record in batch if record is not _LOG_STOP]
+        if not batch:
+            continue
+        try:
+            os.makedirs("logs", exist_ok=True)
+            with open("logs/deployments.log", "a") as f:
+                f.write("".join(record + "\n" for record in batch))
+        except Exception as e:
+            logger.error("Error writing %s record(s) to deployment log: %s", len(batch), e, exc_info=True)
+
+def _log_deployment(record: str):
+    global _log_writer
+    with _log_writer_lock:
+        if _log_writer is None or not _log_writer.is_alive():
+            _log_writer = threading.Thread(target=_drain_deployment_log, name="deployment-log-writer", daemon=True)
+            _log_writer.start()
+        _log_queue.put(record)
+
+def _stop_deployment_log_writer(timeout: float = 5.0):
+    """Write out every queued deployment record and stop the writer thread."""
+    with _log_writer_lock:
+        writer = _log_writer
+        if writer is None or not writer.is_alive():
+            return
+        _log_queue.put(_LOG_STOP)
+    writer.join(timeout)
+
 class DeploymentRequest(BaseModel):
     template_name: str = Field(..., min_length=1, max_length=100)
     parameters: Dict[str, Any]
@@ -326,11 +677,83 @@ class DeploymentRequest(BaseModel):
     resource_group: str = Field(..., min_length=1, max_length=90, pattern=r'^[-\w\._\(\)]+$')
     location: str = Field(..., min_length=1, max_length=100)
 
+# Converters from form values to the ARM parameter type declared by the compiled template
+_TRUE = frozenset(("true", "yes", "1", "on"))
+
+def _identity(value):
+    return value
+
+def _to_array(value):
+    if isinstance(value, str):
+        # Try to parse as JSON array first
+        try:
+            parsed = json.loads(value)
+        except json.JSONDecodeError:
+            # If not JSON, split by comma or treat as single item array
+            return [item.strip() for item in value.split(",")] if "," in value else [value]
+        return parsed if isinstance(parsed, list) else [parsed]
+    if not isinstance(value, list):
+        return [value]  # Wrap single value in array
+    return value
+
+def _to_object(value):
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            # If not valid JSON, create empty object
+            return {}
+    return value
+
+def _to_bool(value):
+    if isinstance(value, str):
+        return value.lower() in _TRUE
+    return bool(value)
+
+def _to_int(value):
+    return int(value) if value != "" else 0
+
+_COERCERS = {
+    "array": _to_array,
+    "object": _to_object,
+    "bool": _to_bool,
+    "int": _to_int,
+}
+
+def build_parameter_transformer(template_params: dict) -> Callable[[dict], dict]:
+    """
+    Specialise the form-to-ARM parameter conversion for one compiled template:
+    each parameter's coercer is looked up once here instead of per value.
+    """
+    coercers = {name: _COERCERS.get(spec.get("type", "").lower(), _identity) for name, spec in template_params.items()}
+
+    def transform(request_parameters: dict) -> dict:
+        azure_parameters = {}
+        for param_name, param_value in request_parameters.items():
+            # Handle cases where the value might be None (e.g., optional parameters not provided)
+            if param_value is None:
+                continue
+            # "Flatten" nested {"value": ...} structures
+            actual_value = param_value
+            while isinstance(actual_value, dict) and "value" in actual_value:
+                actual_value = actual_value["value"]
+            # String and unknown types are kept as is
+            try:
+                actual_value = coercers.get(param_name, _identity)(actual_value)
+            except (ValueError, TypeError) as e:
+                logger.warning("Failed to convert parameter '%s' to expected type '%s': %s. Using original value.",
+                               param_name, template_params[param_name].get("type", "").lower(), e)
+            # Wrap the actual value in the {"value": ...} format required by Azure
+            azure_parameters[param_name] = {"value": actual_value}
+        return azure_parameters
+
+    return transform
+
 @app.post("/deploy")
 async def deploy_template(request: DeploymentRequest):
     try:
         # Initialize Azure clients
-        resource_client = ResourceManagementClient(credential, request.subscription_id)
+        resource_client = _rm_client(request.subscription_id)
         
         # Create resource group if it doesn't exist
         try:
@@ -341,47 +764,43 @@ async def deploy_template(request: DeploymentRequest):
         except ResourceExistsError:
             pass
         except Exception as e:
-            logger.error(f"Error creating/updating resource group: {str(e)}")
+            logger.error("Error creating/updating resource group: %s", e, exc_info=True)
             raise HTTPException(status_code=500, detail=f"Error creating/updating resource group: {str(e)}")
 
-        # Get template content
+        # Locate the template; bicep build reads the file itself
         template_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", f"{request.template_name}.bicep")
-        if not os.path.exists(template_path):
+        if not os.path.isfile(template_path):
             raise HTTPException(status_code=404, detail=f"Template {request.template_name} not found")
-            
-        try:
-            with open(template_path, "r") as f:
-                template_content = f.read()
-        except Exception as e:
-            logger.error(f"Error reading template file: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Error reading template file: {str(e)}")
 
         # Compile Bicep template to ARM JSON
         try:
             # Use the actual template_path for the build command
             build_command = ['bicep', 'build', '--file', template_path]
-            arm_template_json_str, returncode = run_azure_cli_command(build_command)
+            arm_template_json_str, returncode = await run_azure_cli_command_async(build_command)
             
             if returncode != 0:
-                logger.error(f"Bicep build failed for {request.template_name}.bicep. Return code: {returncode}")
+                logger.error("Bicep build failed for %s.bicep. Return code: %s", request.template_name, returncode)
                 raise HTTPException(status_code=500, detail=f"Failed to compile Bicep template: {request.template_name}.bicep")
             
-            # Check if the output is just a warning message
-            if "WARNING:" in arm_template_json_str:
-                # If it's just a warning, try to read the compiled JSON file directly
-                json_path = template_path.replace('.bicep', '.json')
+            # bicep build writes the compiled template next to the .bicep file;
+            # stdout is only used when that file is missing
+            json_path = template_path[:-len(".bicep")] + ".json"
+            if os.path.exists(json_path):
                 try:
-                    with open(json_path, 'r') as f:
-                        arm_template_json = json.load(f)
+                    with open(json_path, "rb") as f:
+                        arm_template_json = _loads(f.read())
                 except Exception as e:
-                    logger.error(f"Failed to read compiled JSON file: {str(e)}")
+                    logger.error("Failed to read compiled JSON file: %s", e, exc_info=True)
                     raise HTTPException(status_code=500, detail=f"Failed to read compiled Bicep template: {str(e)}")
+            elif isinstance(arm_template_json_str, dict):
+                # The CLI helper already extracted and parsed the JSON output
+                arm_template_json = arm_template_json_str
             else:
                 # Parse the JSON output
                 try:
-                    arm_template_json = json.loads(arm_template_json_str)
+                    arm_template_json = _loads(arm_template_json_str)
                 except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse Bicep build output as JSON: {str(e)}. Output: {arm_template_json_str[:500]}...")
+                    logger.error("Failed to parse Bicep build output as JSON: %s. Output: %s...", e, arm_template_json_str[:500], exc_info=True)
                     raise HTTPException(status_code=500, detail=f"Failed to parse Bicep build output: {str(e)}")
             
             logger.info(f"Successfully compiled {request.template_name}.bicep to ARM JSON.")
@@ -390,67 +809,23 @@ async def deploy_template(request: DeploymentRequest):
             logger.error("Azure CLI not found. Please ensure it is installed and in your PATH.")
             raise HTTPException(status_code=500, detail="Azure CLI not found. Please ensure it is installed and in your PATH.")
         except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse Bicep build output as JSON: {str(e)}. Output: {arm_template_json_str[:500]}...")
+            logger.error("Failed to parse Bicep build output as JSON: %s. Output: %s...", e, arm_template_json_str[:500], exc_info=True)
             raise HTTPException(status_code=500, detail=f"Failed to parse Bicep build output: {str(e)}")
         except Exception as e:
-            logger.error(f"Error during Bicep compilation: {str(e)}")
+            logger.error("Error during Bicep compilation: %s", e, exc_info=True)
             raise HTTPException(status_code=500, detail=f"Error during Bicep compilation: {str(e)}")
 
         # Deploy template
         deployment_name = f"deployment-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
-          # Transform parameters to the format expected by Azure API
+        # Transform parameters to the format expected by Azure API
         azure_parameters = {}
         
         # Always include location parameter from the request
         azure_parameters["location"] = {"value": request.location}
         
-        # Get template parameter definitions to understand expected types
-        template_params = arm_template_json.get("parameters", {})
-        
-        for param_name, param_value in request.parameters.items():
-            # Handle cases where the value might be None (e.g., optional parameters not provided)
-            if param_value is not None:
-                # "Flatten" nested {"value": ...} structures
-                actual_value = param_value
-                while isinstance(actual_value, dict) and "value" in actual_value:
-                    actual_value = actual_value["value"]
-
-                # Get the expected parameter type from the template
-                param_def = template_params.get(param_name, {})
-                expected_type = param_def.get("type", "").lower()                # Transform value based on expected type
-                try:
-                    if expected_type == "array":
-                        if isinstance(actual_value, str):
-                            # Try to parse as JSON array first
-                            try:
-                                actual_value = json.loads(actual_value)
-                                if not isinstance(actual_value, list):
-                                    actual_value = [actual_value]  # Wrap single value in array
-                            except json.JSONDecodeError:
-                                # If not JSON, split by comma or treat as single item array
-                                actual_value = [item.strip() for item in actual_value.split(",")] if "," in actual_value else [actual_value]
-                        elif not isinstance(actual_value, list):
-                            actual_value = [actual_value]  # Wrap single value in array
-                    elif expected_type == "object":
-                        if isinstance(actual_value, str):
-                            try:
-                                actual_value = json.loads(actual_value)
-                            except json.JSONDecodeError:
-                                # If not valid JSON, create empty object
-                                actual_value = {}
-                    elif expected_type == "bool":
-                        if isinstance(actual_value, str):
-                            actual_value = actual_value.lower() in ("true", "yes", "1", "on")
-                        else:
-                            actual_value = bool(actual_value)
-                    elif expected_type == "int":
-                        actual_value = int(actual_value) if actual_value != "" else 0
-                    # For string types, keep as is
-                except (ValueError, TypeError) as e:
-                    logger.warning(f"Failed to convert parameter '{param_name}' to expected type '{expected_type}': {str(e)}. Using original value.")
-                
-                # Wrap the actual value in the {"value": ...} format required by Azure
-                azure_parameters[param_name] = { "value": actual_value }
+        # Convert each value to the type the template declares for it
+        transform = build_parameter_transformer(arm_template_json.get("parameters", {}))
+        azure_parameters.update(transform(request.parameters))
 
         deployment_properties = {
             "template": arm_template_json,
@@ -468,7 +843,7 @@ async def deploy_template(request: DeploymentRequest):
             logger.info(f"Deployment {deployment_name} completed successfully. ID: {deployment.id}")
             
         except Exception as e:
-            logger.error(f"Error during deployment: {str(e)}")
+            logger.error("Error during deployment: %s", e, exc_info=True)
             
             # Extract more detailed error information if available
             error_details = str(e)
@@ -477,7 +852,7 @@ async def deploy_template(request: DeploymentRequest):
             elif hasattr(e, 'message'):
                 error_details = e.message
                 
-            logger.error(f"Detailed deployment error: {error_details}")
+            logger.error("Detailed deployment error: %s", error_details)
             raise HTTPException(status_code=500, detail=f"Deployment failed: {error_details}")
               # Log deployment success
         deployment_log = {
@@ -491,12 +866,10 @@ async def deploy_template(request: DeploymentRequest):
         }
         
         try:
-            os.makedirs("logs", exist_ok=True)
-            with open("logs/deployments.log", "a") as f:
-                f.write(json.dumps(deployment_log) + "\n")
-            logger.info(f"Deployment logged successfully: {deployment_name}")
+            _log_deployment(_dumps(deployment_log))
+            logger.info(f"Deployment queued for logging: {deployment_name}")
         except Exception as e:
-            logger.error(f"Error writing to deployment log: {str(e)}")
+            logger.error("Error writing to deployment log: %s", e, exc_info=True)
             # Don't raise an exception here as the deployment was successful
 
         return {
@@ -510,7 +883,7 @@ async def deploy_template(request: DeploymentRequest):
         # Re-raise HTTP exceptions (these are expected errors)
         raise
     except Exception as e:
-        logger.error(f"Deployment failed: {str(e)}")
+        logger.error("Deployment failed: %s", e, exc_info=True)
         
         # Log the failure
         failure_log = {
@@ -523,73 +896,84 @@ async def deploy_template(request: DeploymentRequest):
         }
         
         try:
-            os.makedirs("logs", exist_ok=True)
-            with open("logs/deployments.log", "a") as f:
-                f.write(json.dumps(failure_log) + "\n")
+            _log_deployment(_dumps(failure_log))
         except Exception as log_e:
-            logger.error(f"Failed to log deployment failure: {str(log_e)}")
+            logger.error("Failed to log deployment failure: %s", log_e, exc_info=True)
             
         raise HTTPException(status_code=500, detail=f"Deployment failed: {str(e)}")
 
-@app.get("/deployments")
-async def list_deployments(subscription_id: str | None = None):
+def _tail_deployments(log_file: str, max_bytes: int = 262144, max_records: int = 500):
+    """
+    Read the most recent deployment records from the end of the deployments log.
+    The log is append-only, so records come back newest first by walking the
+    tail of the file backwards; only the last max_bytes of the file are read.
+    """
     deployments = []
+    with open(log_file, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        start = max(0, end - max_bytes)
+        f.seek(start)
+        if start > 0:
+            # Discard the partial record we landed in the middle of
+            f.readline()
+        chunk = f.read().decode("utf-8", "replace")
+
+    for line in reversed(chunk.splitlines()):
+        line = line.strip()
+        if not line or not (line.startswith("{") and line.endswith("}")):
+            continue
+        try:
+            obj = _loads(line)
+            # Check if this looks like a deployment record (has required minimum fields)
+            required_fields = ("timestamp", "template", "status")
+            if isinstance(obj, dict) and all(k in obj for k in required_fields):
+                # Ensure we have deployment_id (some old records might not have it)
+                if "deployment_id" not in obj:
+                    obj["deployment_id"] = f"legacy-{obj.get('timestamp', 'unknown')}"
+                # Ensure we have parameters (some records might not have it)
+                if "parameters" not in obj:
+                    obj["parameters"] = {}
+                deployments.append(obj)
+                if len(deployments) >= max_records:
+                    break
+        except json.JSONDecodeError as parse_exc:
+            logger.debug(f"Skipping invalid JSON line in deployments.log: {line[:100]}... ({parse_exc})")
+        except Exception as e:
+            logger.error("Error processing deployment log line: %s", e)
+            continue
+    return deployments
+
+@app.get("/deployments")
+async def list_deployments(subscription_id: str | None = None, limit: int = Query(500, ge=1)):
     log_file = "logs/deployments.log"
     
     if not os.path.exists(log_file):
-        return deployments
+        return []
         
     try:
-        with open(log_file, "r") as f:
-            for line in f:
-                line = line.strip()
-                if not line or not (line.startswith("{") and line.endswith("}")):
-                    continue
-                try:
-                    obj = json.loads(line)
-                    # Check if this looks like a deployment record (has required minimum fields)
-                    required_fields = ("timestamp", "template", "status")
-                    if isinstance(obj, dict) and all(k in obj for k in required_fields):
-                        # Ensure we have deployment_id (some old records might not have it)
-                        if "deployment_id" not in obj:
-                            obj["deployment_id"] = f"legacy-{obj.get('timestamp', 'unknown')}"
-                        # Ensure we have parameters (some records might not have it)
-                        if "parameters" not in obj:
-                            obj["parameters"] = {}
-                        deployments.append(obj)
-                except json.JSONDecodeError as parse_exc:
-                    logger.debug(f"Skipping invalid JSON line in deployments.log: {line[:100]}... ({parse_exc})")
-                except Exception as e:
-                    logger.error(f"Error processing deployment log line: {str(e)}")
-                    continue
+        return _tail_deployments(log_file, max_records=limit)
     except FileNotFoundError:
         logger.warning("Deployments log file not found")
+        return []
     except PermissionError:
         logger.error("Permission denied when accessing deployments log file")
         raise HTTPException(status_code=500, detail="Permission denied when accessing deployments log")
     except Exception as e:
-        logger.error(f"Error reading deployments log: {str(e)}")
+        logger.error("Error reading deployments log: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Error reading deployments log")
-    
-    # Sort deployments by timestamp (newest first)
-    try:
-        deployments.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-    except Exception as e:
-        logger.warning(f"Error sorting deployments: {str(e)}")
-        
-    return deployments
 
 @app.get("/subscriptions")
 async def list_subscriptions():
     logger.info("/subscriptions endpoint called")
     try:
         # Use SubscriptionClient to list all accessible subscriptions
-        subscription_client = SubscriptionClient(credential)
+        subscription_client = _subscription_client()
         subscriptions_list = list(subscription_client.subscriptions.list())
         logger.info(f"/subscriptions endpoint returning {len(subscriptions_list)} subscriptions")
         return [{"id": sub.subscription_id, "name": sub.display_name} for sub in subscriptions_list]
     except Exception as e:
-        logger.error(f"Failed to get subscriptions: {str(e)}")
+        logger.error("Failed to get subscriptions: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 class ResourceGroupCreateRequest(BaseModel):
@@ -603,7 +987,7 @@ async def create_resource_group(request: ResourceGroupCreateRequest):
         if not credential:
             raise HTTPException(status_code=500, detail="Azure credentials not initialized.")
             
-        resource_client = ResourceManagementClient(credential, request.subscription_id)
+        resource_client = _rm_client(request.subscription_id)
         
         resource_group = resource_client.resource_groups.create_or_update(
             request.name,
@@ -617,158 +1001,99 @@ async def create_resource_group(request: ResourceGroupCreateRequest):
         logger.warning(f"Attempted to create resource group {request.name} that already exists.")
         raise HTTPException(status_code=409, detail=f"Resource group {request.name} already exists.")
     except Exception as e:
-        logger.error(f"Failed to create resource group {request.name}: {str(e)}")
+        logger.error("Failed to create resource group %s: %s", request.name, e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to create resource group: {str(e)}")
 
 @app.get("/resource-groups")
-async def list_resource_groups(subscription_id: str | None = None):
+async def list_resource_groups(subscription_id: str = Depends(current_subscription_id)):
     try:
-        current_subscription_id = subscription_id
-        if not current_subscription_id:
-            try:
-                account_info_output, account_returncode = run_azure_cli_command(['account', 'show'])
-                if account_returncode == 0 and isinstance(account_info_output, dict) and account_info_output.get("id"):
-                    current_subscription_id = account_info_output["id"]
-                    logger.info(f"Using default subscription from Azure CLI: {current_subscription_id}")
-                else:
-                    raise HTTPException(status_code=400, detail="Subscription ID is required or login to Azure CLI with a default subscription.")
-            except Exception as cli_e:
-                logger.error(f"Error getting default subscription from Azure CLI: {cli_e}")
-                raise HTTPException(status_code=500, detail=f"Could not determine default subscription: {str(cli_e)}")
-
-        if not credential:
-            raise HTTPException(status_code=500, detail="Azure credentials not initialized.")
-
-        resource_client = ResourceManagementClient(credential, current_subscription_id)
+        resource_client = _rm_client(subscription_id)
         groups = list(resource_client.resource_groups.list())
         return [{"name": group.name, "location": group.location, "resource_count": 0} for group in groups]
     except Exception as e:
-        logger.error(f"Failed to get resource groups: {str(e)}")
+        logger.error("Failed to get resource groups: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+# Icons for resources keyed by (provider, resource type), both lowercased;
+# providers in _PROVIDER_DEFAULT_ICONS use one icon for every resource type
+_RESOURCE_ICON_MAP = {
+    ("compute", "virtualmachines"): "pc-display",
+    ("compute", "virtualmachinescalesets"): "pc-display",
+    ("storage", "storageaccounts"): "hdd-stack",
+    ("web", "sites"): "globe",
+    ("network", "virtualnetworks"): "diagram-3",
+    ("network", "networkinterfaces"): "ethernet",
+    ("network", "publicipaddresses"): "globe",
+    ("network", "networksecuritygroups"): "shield-lock",
+    ("keyvault", "vaults"): "key",
+    ("documentdb", "databaseaccounts"): "server",
+}
+_PROVIDER_DEFAULT_ICONS = {"insights": "graph-up"}
+
+def _resource_to_dict(resource):
+    # Extract resource provider and resource type for icon assignment
+    namespace, _, rest = resource.type.partition('/')
+    provider = namespace.rpartition('.')[2].lower()
+    resource_type = rest.partition('/')[0].lower()
+    return {
+        "id": resource.id,
+        "name": resource.name,
+        "type": resource.type,
+        "location": getattr(resource, 'location', None),
+        "tags": getattr(resource, 'tags', None),
+        "properties": {},
+        "icon": _RESOURCE_ICON_MAP.get((provider, resource_type)) or _PROVIDER_DEFAULT_ICONS.get(provider, "box")
+    }
+
 @app.get("/resource-groups/{resource_group_name}/resources")
-async def list_resources_in_resource_group(resource_group_name: str, subscription_id: str | None = None):
+async def list_resources_in_resource_group(resource_group_name: str, subscription_id: str = Depends(current_subscription_id)):
     """
     List all resources within a specific resource group.
     """
     try:
         logger.info(f"Listing resources in resource group: {resource_group_name}")
-        current_subscription_id = subscription_id
+        resource_client = _rm_client(subscription_id)
         
-        if not current_subscription_id:
-            try:
-                account_info_output, account_returncode = run_azure_cli_command(['account', 'show'])
-                if account_returncode == 0 and isinstance(account_info_output, dict) and account_info_output.get("id"):
-                    current_subscription_id = account_info_output["id"]
-                    logger.info(f"Using default subscription from Azure CLI: {current_subscription_id}")
-                else:
-                    raise HTTPException(status_code=400, detail="Subscription ID is required or login to Azure CLI with a default subscription.")
-            except Exception as cli_e:
-                logger.error(f"Error getting default subscription from Azure CLI: {cli_e}")
-                raise HTTPException(status_code=500, detail=f"Could not determine default subscription: {str(cli_e)}")
-
-        if not credential:
-            raise HTTPException(status_code=500, detail="Azure credentials not initialized.")
-
-        resource_client = ResourceManagementClient(credential, current_subscription_id)
-        
-        # Get resources within the specified resource group
-        resources = list(resource_client.resources.list_by_resource_group(resource_group_name))
-        
-        # Transform to a simplified format
-        result = []
-        for resource in resources:
-            resource_dict = {
-                "id": resource.id,
-                "name": resource.name,
-                "type": resource.type,
-                "location": resource.location if hasattr(resource, 'location') else None,
-                "tags": resource.tags if hasattr(resource, 'tags') else None,
-                "properties": {}
-            }
-            
-            # Extract resource provider and resource type for icon assignment
-            resource_type_parts = resource.type.split('/')
-            provider = resource_type_parts[0].split('.')[-1] if len(resource_type_parts) > 0 else ""
-            resource_type = resource_type_parts[1] if len(resource_type_parts) > 1 else ""
-            # Assign appropriate icon based on resource type
-            icon = "box"  # Default icon
-            if provider.lower() == "compute":
-                if resource_type.lower() in ["virtualmachines", "virtualmachinescalesets"]:
-                    icon = "pc-display"
-            elif provider.lower() == "storage":
-                if resource_type.lower() == "storageaccounts":
-                    icon = "hdd-stack"
-            elif provider.lower() == "web":
-                if resource_type.lower() == "sites":
-                    icon = "globe"
-            elif provider.lower() == "network":
-                if resource_type.lower() == "virtualnetworks":
-                    icon = "diagram-3"
-                elif resource_type.lower() == "networkinterfaces":
-                    icon = "ethernet"
-                elif resource_type.lower() == "publicipaddresses":
-                    icon = "globe"
-                elif resource_type.lower() == "networksecuritygroups":
-                    icon = "shield-lock"
-            elif provider.lower() == "keyvault":
-                if resource_type.lower() == "vaults":
-                    icon = "key"
-            elif provider.lower() == "documentdb":
-                if resource_type.lower() == "databaseaccounts":
-                    icon = "server"
-            elif provider.lower() == "insights":
-                icon = "graph-up"
-            resource_dict["icon"] = icon
-            result.append(resource_dict)
+        # Transform resources to a simplified format straight from the pager
+        result = [_resource_to_dict(r) for r in resource_client.resources.list_by_resource_group(resource_group_name)]
         
         logger.info(f"Found {len(result)} resources in resource group {resource_group_name}")
         return {"resources": result}
         
     except Exception as e:
-        logger.error(f"Failed to list resources in resource group {resource_group_name}: {str(e)}")
+        logger.error("Failed to list resources in resource group %s: %s", resource_group_name, e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/resource-groups/{resource_group_name}")
-async def delete_resource_group(resource_group_name: str, subscription_id: str | None = None):
+async def delete_resource_group(resource_group_name: str, subscription_id: str = Depends(current_subscription_id), force: bool = False):
     """
     Delete a resource group and all its contained resources.
     This is a destructive operation that cannot be undone.
+    With force=true the existence check is skipped and the delete is sent directly.
     """
     try:
         logger.info(f"Initiating deletion of resource group: {resource_group_name}")
-        current_subscription_id = subscription_id
+        resource_client = _rm_client(subscription_id)
         
-        if not current_subscription_id:
+        # The SDK calls are blocking, so they run in a worker thread to keep the event loop free
+        if not force:
+            # Check if resource group exists before attempting deletion
             try:
-                account_info_output, account_returncode = run_azure_cli_command(['account', 'show'])
-                if account_returncode == 0 and isinstance(account_info_output, dict) and account_info_output.get("id"):
-                    current_subscription_id = account_info_output["id"]
-                    logger.info(f"Using default subscription from Azure CLI: {current_subscription_id}")
+                await asyncio.to_thread(resource_client.resource_groups.get, resource_group_name)
+            except Exception as e:
+                if "ResourceGroupNotFound" in str(e) or "not found" in str(e).lower():
+                    logger.warning(f"Resource group {resource_group_name} not found for deletion")
+                    raise HTTPException(status_code=404, detail=f"Resource group '{resource_group_name}' not found")
                 else:
-                    raise HTTPException(status_code=400, detail="Subscription ID is required or login to Azure CLI with a default subscription.")
-            except Exception as cli_e:
-                logger.error(f"Error getting default subscription from Azure CLI: {cli_e}")
-                raise HTTPException(status_code=500, detail=f"Could not determine default subscription: {str(cli_e)}")
-
-        if not credential:
-            raise HTTPException(status_code=500, detail="Azure credentials not initialized.")
-
-        resource_client = ResourceManagementClient(credential, current_subscription_id)
-        
-        # Check if resource group exists before attempting deletion
-        try:
-            resource_client.resource_groups.get(resource_group_name)
-        except Exception as e:
-            if "ResourceGroupNotFound" in str(e) or "not found" in str(e).lower():
-                logger.warning(f"Resource group {resource_group_name} not found for deletion")
-                raise HTTPException(status_code=404, detail=f"Resource group '{resource_group_name}' not found")
-            else:
-                logger.error(f"Error checking resource group existence: {str(e)}")
-                raise HTTPException(status_code=500, detail=f"Error checking resource group: {str(e)}")
+                    logger.error("Error checking resource group existence: %s", e, exc_info=True)
+                    raise HTTPException(status_code=500, detail=f"Error checking resource group: {str(e)}")
         
         # Initiate async deletion (resource group deletion is always async in Azure)
-        delete_operation = resource_client.resource_groups.begin_delete(resource_group_name)
+        try:
+            delete_operation = await asyncio.to_thread(resource_client.resource_groups.begin_delete, resource_group_name)
+        except ResourceNotFoundError:
+            logger.warning(f"Resource group {resource_group_name} not found for deletion")
+            raise HTTPException(status_code=404, detail=f"Resource group '{resource_group_name}' not found")
         
         # Log the deletion initiation
         logger.info(f"Resource group {resource_group_name} deletion initiated successfully. Operation status: {delete_operation.status()}")
@@ -777,7 +1102,7 @@ async def delete_resource_group(resource_group_name: str, subscription_id: str |
             "status": "accepted", 
             "message": f"Resource group '{resource_group_name}' deletion initiated",
             "resource_group": resource_group_name,
-            "subscription_id": current_subscription_id,
+            "subscription_id": subscription_id,
             "operation_status": delete_operation.status()
         }
         
@@ -785,38 +1110,38 @@ async def delete_resource_group(resource_group_name: str, subscription_id: str |
         # Re-raise HTTP exceptions as-is
         raise
     except Exception as e:
-        logger.error(f"Failed to delete resource group {resource_group_name}: {str(e)}")
+        logger.error("Failed to delete resource group %s: %s", resource_group_name, e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to delete resource group: {str(e)}")
 
 # Exception handlers
 @app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Unhandled exception: {str(exc)}")
-    return JSONResponse(
+    logger.error("Unhandled exception: %s", exc, exc_info=True)
+    return _JSONResponse(
         status_code=500,
         content={"message": "An unexpected error occurred", "detail": str(exc)}
     )
 
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
-    logger.error(f"HTTP exception: {str(exc.detail)}")
-    return JSONResponse(
+    logger.error("HTTP exception: %s", exc.detail)
+    return _JSONResponse(
         status_code=exc.status_code,
         content={"message": str(exc.detail)}
     )
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    logger.error(f"Validation error: {str(exc)}")
-    return JSONResponse(
+    logger.error("Validation error: %s", exc)
+    return _JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={"message": "Validation error", "detail": exc.errors()}
     )
 
 @app.exception_handler(ClientAuthenticationError)
 async def auth_exception_handler(request: Request, exc: ClientAuthenticationError):
-    logger.error(f"Authentication error: {str(exc)}")
-    return JSONResponse(
+    logger.error("Authentication error: %s", exc)
+    return _JSONResponse(
         status_code=status.HTTP_401_UNAUTHORIZED,
         content={"message": "Authentication failed", "detail": str(exc)}
     )
\ No newline at end of file
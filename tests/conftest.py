@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# Shared helpers live next to the tests; put them on the path explicitly so
+# collection does not depend on pytest's import mode
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from helpers import TEMPLATE_PATH, load_arm_template
+
+@pytest.fixture(scope="session")
+def arm_template():
+    """The compiled Virtual Network ARM template, loaded once per test session."""
+    template = load_arm_template(TEMPLATE_PATH)
+    assert template, "Failed to load ARM template"
+    return template
@@ -0,0 +1,49 @@
+"""Shared helpers for the backend tests."""
+
+import json
+import os
+import sys
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Pretty-printed JSON is only built when someone will read it: an interactive
+# run, or VERBOSE set; under pytest's captured output neither holds
+VERBOSE = sys.stdout.isatty() or bool(os.environ.get("VERBOSE"))
+
+def _pretty(obj):
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode() if orjson else json.dumps(obj, indent=2)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_PATH = os.path.join(PROJECT_ROOT, "templates", "Virtual Network.bicep")
+
+# Parsed compiled templates keyed by JSON path, along with the mtime they were read at
+_TEMPLATE_CACHE: dict[str, tuple[float, dict]] = {}
+
+def load_arm_template(template_path=TEMPLATE_PATH):
+    """Load and compile the Virtual Network Bicep template to get parameter types."""
+    if not os.path.exists(template_path):
+        print(f"❌ Template file not found: {template_path}")
+        return None
+    
+    # Read the compiled JSON file, reusing the parsed copy until the file changes
+    json_path = template_path.replace('.bicep', '.json')
+    if os.path.exists(json_path):
+        try:
+            mtime = os.path.getmtime(json_path)
+            cached = _TEMPLATE_CACHE.get(json_path)
+            if cached and cached[0] == mtime:
+                return cached[1]
+            with open(json_path, 'rb') as f:
+                data = f.read()
+            arm_template = orjson.loads(data) if orjson else json.loads(data)
+            _TEMPLATE_CACHE[json_path] = (mtime, arm_template)
+            return arm_template
+        except Exception as e:
+            print(f"❌ Error reading compiled template: {e}")
+            return None
+    else:
+        print(f"❌ Compiled template not found: {json_path}")
+        return None
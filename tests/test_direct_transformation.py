@@ -4,111 +4,140 @@ Direct test of parameter transformation logic without API calls.
 This test verifies that our parameter type conversion is working correctly.
 """
 
+import functools
 import json
+import logging
 import os
 import sys
 
-def load_arm_template():
-    """Load and compile the Virtual Network Bicep template to get parameter types."""
-    template_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "Virtual Network.bicep")
-    
-    if not os.path.exists(template_path):
-        print(f"❌ Template file not found: {template_path}")
-        return None
-    
-    # Read the compiled JSON file
-    json_path = template_path.replace('.bicep', '.json')
-    if os.path.exists(json_path):
+import pytest
+
+from helpers import PROJECT_ROOT, TEMPLATE_PATH, VERBOSE, _pretty, load_arm_template
+
+# The backend package sits in the project root
+sys.path.insert(0, PROJECT_ROOT)
+
+from backend.main import build_parameter_transformer
+
+log = logging.getLogger(__name__)
+
+# Strings accepted as true for bool parameters (matches the backend's _TRUE)
+_TRUTHY = frozenset(("true", "1", "yes", "on"))
+
+def _conv_array(actual_value):
+    # Parse string as JSON array, or use as-is if already an array
+    if isinstance(actual_value, str):
+        if actual_value.strip() == "":
+            log.debug("   ✅ Empty string → empty array: []")
+            return []
         try:
-            with open(json_path, 'r') as f:
-                arm_template = json.load(f)
-            return arm_template
-        except Exception as e:
-            print(f"❌ Error reading compiled template: {e}")
-            return None
-    else:
-        print(f"❌ Compiled template not found: {json_path}")
-        return None
+            actual_value = json.loads(actual_value)
+            log.debug("   ✅ JSON parsed array: %s", actual_value)
+        except json.JSONDecodeError:
+            # If JSON parsing fails, try to split by comma and clean up
+            actual_value = [item.strip().strip('"\'') for item in actual_value.split(',') if item.strip()]
+            log.debug("   ⚠️  JSON parse failed, comma split: %s", actual_value)
+        return actual_value
+    if not isinstance(actual_value, list):
+        log.debug("   ✅ Single value → array: %s", [actual_value])
+        return [actual_value]
+    log.debug("   ✅ Already an array: %s", actual_value)
+    return actual_value
+
+def _conv_object(actual_value):
+    # Parse string as JSON object, or use as-is if already an object
+    if isinstance(actual_value, str):
+        if actual_value.strip() == "":
+            log.debug("   ✅ Empty string → empty object: {}")
+            return {}
+        actual_value = json.loads(actual_value)
+        log.debug("   ✅ JSON parsed object: %s", actual_value)
+        return actual_value
+    if not isinstance(actual_value, dict):
+        log.debug("   ⚠️  Non-dict converted to empty object: {}")
+        return {}
+    log.debug("   ✅ Already an object: %s", actual_value)
+    return actual_value
+
+def _conv_bool(actual_value):
+    # Convert string to boolean
+    if isinstance(actual_value, str):
+        actual_value = actual_value.lower() in _TRUTHY
+        log.debug("   ✅ String → boolean: %s", actual_value)
+        return actual_value
+    actual_value = bool(actual_value)
+    log.debug("   ✅ Value → boolean: %s", actual_value)
+    return actual_value
+
+def _conv_int(actual_value):
+    # Convert to integer
+    if isinstance(actual_value, str):
+        actual_value = int(actual_value) if actual_value.strip() else 0
+        log.debug("   ✅ String → integer: %s", actual_value)
+        return actual_value
+    actual_value = int(actual_value)
+    log.debug("   ✅ Value → integer: %s", actual_value)
+    return actual_value
+
+def _conv_str(actual_value):
+    log.debug("   ✅ String type, no conversion needed: %r", actual_value)
+    return actual_value
+
+# Conversion for each ARM parameter type; anything else is passed through as a string
+_CONVERTERS = {
+    "array": _conv_array,
+    "object": _conv_object,
+    "bool": _conv_bool,
+    "int": _conv_int,
+}
+
+def _unwrap(value):
+    """Flatten nested {"value": ...} structures; payloads are plain dicts, so an exact type check suffices."""
+    while type(value) is dict and "value" in value:
+        value = value["value"]
+    return value
+
+def _parameter_types(arm_template):
+    """Map each ARM template parameter name to its lowercased type."""
+    return {name: spec.get("type", "string").lower() for name, spec in arm_template.get("parameters", {}).items()}
+
+@functools.lru_cache(maxsize=16)
+def _type_map(template_path: str, mtime: float) -> dict[str, str]:
+    """Parameter types of a template file; the mtime is part of the key so edits are picked up."""
+    return _parameter_types(load_arm_template(template_path))
 
 def transform_parameters(arm_template, request_parameters):
-    """Transform parameters using the same logic as the backend."""
+    """
+    Transform parameters using the same logic as the backend.
+    arm_template may also be a .bicep template path, whose parameter types are then cached.
+    """
     azure_parameters = {}
-    template_parameters = arm_template.get("parameters", {})
+    if isinstance(arm_template, str):
+        json_path = arm_template.replace('.bicep', '.json')
+        parameter_types = _type_map(arm_template, os.path.getmtime(json_path))
+    else:
+        parameter_types = _parameter_types(arm_template)
     
     for param_name, param_value in request_parameters.items():
         # Handle cases where the value might be None
         if param_value is not None:
-            # "Flatten" nested {"value": ...} structures
-            actual_value = param_value
-            while isinstance(actual_value, dict) and "value" in actual_value:
-                actual_value = actual_value["value"]
+            actual_value = _unwrap(param_value)
 
             # Get the expected parameter type from the ARM template
-            param_type = template_parameters.get(param_name, {}).get("type", "string").lower()
+            param_type = parameter_types.get(param_name, "string")
+            if param_type == "string":
+                # Most parameters are plain strings and need no conversion
+                azure_parameters[param_name] = {"value": actual_value}
+                continue
             
-            print(f"\n🔄 Processing parameter '{param_name}' (expected type: {param_type})")
-            print(f"   Input value: {repr(actual_value)}")
+            log.debug("🔄 Processing parameter '%s' (expected type: %s)", param_name, param_type)
+            log.debug("   Input value: %r", actual_value)
             
             # Convert the value to the correct type based on ARM template definition
             try:
-                if param_type == "array":
-                    # Parse string as JSON array, or use as-is if already an array
-                    if isinstance(actual_value, str):
-                        if actual_value.strip() == "":
-                            actual_value = []
-                            print(f"   ✅ Empty string → empty array: {actual_value}")
-                        else:
-                            try:
-                                actual_value = json.loads(actual_value)
-                                print(f"   ✅ JSON parsed array: {actual_value}")
-                            except json.JSONDecodeError:
-                                # If JSON parsing fails, try to split by comma and clean up
-                                actual_value = [item.strip().strip('"\'') for item in actual_value.split(',') if item.strip()]
-                                print(f"   ⚠️  JSON parse failed, comma split: {actual_value}")
-                    elif not isinstance(actual_value, list):
-                        actual_value = [actual_value]
-                        print(f"   ✅ Single value → array: {actual_value}")
-                    else:
-                        print(f"   ✅ Already an array: {actual_value}")
-                
-                elif param_type == "object":
-                    # Parse string as JSON object, or use as-is if already an object
-                    if isinstance(actual_value, str):
-                        if actual_value.strip() == "":
-                            actual_value = {}
-                            print(f"   ✅ Empty string → empty object: {actual_value}")
-                        else:
-                            actual_value = json.loads(actual_value)
-                            print(f"   ✅ JSON parsed object: {actual_value}")
-                    elif not isinstance(actual_value, dict):
-                        actual_value = {}
-                        print(f"   ⚠️  Non-dict converted to empty object: {actual_value}")
-                    else:
-                        print(f"   ✅ Already an object: {actual_value}")
-                
-                elif param_type == "bool":
-                    # Convert string to boolean
-                    if isinstance(actual_value, str):
-                        actual_value = actual_value.lower() in ('true', '1', 'yes', 'on')
-                        print(f"   ✅ String → boolean: {actual_value}")
-                    else:
-                        actual_value = bool(actual_value)
-                        print(f"   ✅ Value → boolean: {actual_value}")
-                
-                elif param_type == "int":
-                    # Convert to integer
-                    if isinstance(actual_value, str):
-                        actual_value = int(actual_value) if actual_value.strip() else 0
-                        print(f"   ✅ String → integer: {actual_value}")
-                    else:
-                        actual_value = int(actual_value)
-                        print(f"   ✅ Value → integer: {actual_value}")
-                
-                else:
-                    print(f"   ✅ String type, no conversion needed: {repr(actual_value)}")
-                
+                actual_value = _CONVERTERS.get(param_type, _conv_str)(actual_value)
             except (json.JSONDecodeError, ValueError) as e:
-                print(f"   ❌ Conversion failed: {e}. Using original value.")
+                log.debug("   ❌ Conversion failed: %s. Using original value.", e)
                 # If conversion fails, use the original value
 
             # Wrap the actual value in the {"value": ...} format required by Azure
@@ -116,13 +145,12 @@ def transform_parameters(arm_template, request_parameters):
     
     return azure_parameters
 
-def test_parameter_transformation():
+def test_parameter_transformation(arm_template):
     """Test the parameter transformation logic directly."""
     print("🧪 Testing Parameter Transformation Logic")
     print("=" * 50)
     
-    # Load ARM template and parameters
-    arm_template = load_arm_template()
+    # The ARM template comes from the session-scoped fixture in conftest.py
     if not arm_template:
         assert False, "Failed to load ARM template"
     
@@ -154,8 +182,9 @@ def test_parameter_transformation():
     # Transform parameters using the same logic as the backend
     azure_parameters = transform_parameters(arm_template, request_parameters)
     
-    print(f"\n📤 Final Azure Parameters (backend output):")
-    print(json.dumps(azure_parameters, indent=2))
+    if VERBOSE:
+        print(f"\n📤 Final Azure Parameters (backend output):")
+        print(_pretty(azure_parameters))
     
     # Validate the results
     assert "vnetName" in azure_parameters
@@ -171,9 +200,72 @@ def test_parameter_transformation():
     print("✅ All parameter transformations validated successfully!")
 
 
+@pytest.mark.parametrize("param_name, raw, expected", [
+    ("vnetName", "test-vnet", "test-vnet"),
+    ("vnetName", {"value": "wrapped-vnet"}, "wrapped-vnet"),
+    ("enableDdosProtection", "false", False),
+    ("enableVmProtection", "true", True),
+    ("enableDnsServers", "Yes", True),
+    ("additionalSubnets", '["subnet1", "subnet2"]', ["subnet1", "subnet2"]),
+    ("additionalSubnets", "", [""]),
+    ("dnsServers", "8.8.8.8, 8.8.4.4", ["8.8.8.8", "8.8.4.4"]),
+    ("tags", '{"environment": "test"}', {"environment": "test"}),
+    ("tags", "", {}),
+    ("someIntValue", "42", "42"),  # not a template parameter, so left as a string
+])
+def test_single_param(arm_template, param_name, raw, expected):
+    """Each parameter type converts on its own through the backend's coercers, reusing the session's parsed template."""
+    azure_parameters = build_parameter_transformer(arm_template["parameters"])({param_name: raw})
+    value = azure_parameters[param_name]["value"]
+    assert value == expected
+    assert type(value) is type(expected)
+
+
+def test_backend_parameter_transformer(arm_template):
+    """The backend's per-template transformer converts a whole request the way deploy_template sends it."""
+    request_parameters = {
+        "vnetName": {"value": "test-vnet"},
+        "additionalSubnets": "subnet1, subnet2",
+        "dnsServers": '["8.8.8.8"]',
+        "enableDdosProtection": "false",
+        "enableVmProtection": True,
+        "tags": "{\"environment\": \"test\"}",
+        "ddosProtectionPlanId": None,
+        "someIntValue": "42"
+    }
+    transform = build_parameter_transformer(arm_template["parameters"])
+    assert transform(request_parameters) == {
+        "vnetName": {"value": "test-vnet"},
+        "additionalSubnets": {"value": ["subnet1", "subnet2"]},
+        "dnsServers": {"value": ["8.8.8.8"]},
+        "enableDdosProtection": {"value": False},
+        "enableVmProtection": {"value": True},
+        "tags": {"value": {"environment": "test"}},
+        "someIntValue": {"value": "42"},
+    }
+
+
+def test_transform_parameters_from_template_path(arm_template):
+    """A template path goes through the mtime-keyed type cache and matches the parsed template."""
+    request_parameters = {
+        "vnetName": "test-vnet",
+        "additionalSubnets": "subnet1, subnet2",
+        "enableDdosProtection": "false",
+        "tags": "{\"environment\": \"test\"}",
+    }
+    expected = transform_parameters(arm_template, request_parameters)
+    _type_map.cache_clear()
+    assert transform_parameters(TEMPLATE_PATH, request_parameters) == expected
+    assert transform_parameters(TEMPLATE_PATH, request_parameters) == expected
+    info = _type_map.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+
+
 def main():
     """For standalone testing."""
-    test_parameter_transformation()
+    # Show the per-parameter conversion trace that pytest keeps quiet
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+    test_parameter_transformation(load_arm_template())
 
 if __name__ == "__main__":
     main()
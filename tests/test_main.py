@@ -2,9 +2,46 @@ import pytest
 import sys
 import os
 import json
+import mmap
+import re
+from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+# Project layout, resolved once for every test below
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FRONTEND_DIR = os.path.join(PROJECT_ROOT, "frontend")
+BACKEND_DIR = os.path.join(PROJECT_ROOT, "backend")
 
 # Add the parent directory to the path so we can import the app
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Every token test_html_structure looks for, found in one pass; tag names match in any case
+_HTML_TOKENS_RE = re.compile(rb"(?i:<html|<head>|<body>|</html>)|id=\"mainContent\"|id='mainContent'|main\.js")
+# A CSS rule: an opening brace followed by its closing brace
+_CSS_RULE_RE = re.compile(rb"\{[^}]*\}")
+# The bracket characters test_javascript_syntax balances
+_JS_BRACKETS_RE = re.compile(rb"[{}()]")
+
+@contextmanager
+def _mapped(path):
+    """Map a file read-only so it can be scanned as bytes without copying or decoding it."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap refuses empty files
+            yield b""
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                yield content
+
+def _scan_js_file(file_path):
+    """Read a JS file and return its bracket counts and whether it defines any function."""
+    # Basic syntax check - ensure file can be read and has matching braces
+    with _mapped(file_path) as content:
+        # Collect only the brackets in one pass, then compare braces and parentheses
+        counts = Counter(_JS_BRACKETS_RE.findall(content))
+        has_function = content.find(b'function(') != -1 or content.find(b'function ') != -1 or content.find(b'=>') != -1
+    return counts, has_function
 
 # Test the backend by testing file structure and syntax
 class TestAzureResourceManagerPortal:
@@ -18,9 +55,61 @@ class TestAzureResourceManagerPortal:
         except ImportError as e:
             pytest.fail(f"Failed to import backend.main: {e}")
     
+    def test_bicep_parameter_parsing(self):
+        """Test that Bicep params parse with or without spaces around '=' and keep only their own decorators"""
+        from backend.main import parse_bicep_parameters
+        content = "\n".join([
+            "@description('belongs to the type')",
+            "type sku = string",
+            "param a string='x'",
+            "param b int=5",
+            "@secure()",
+            "param c string",
+            "@description('kept across @allowed')",
+            "@allowed([",
+            "  'A'",
+            "  'B'",
+            "])",
+            "param d string = 'A'",
+            "param e string = 'x=y'",
+            "param f string = '''multi'''",
+        ])
+        params = parse_bicep_parameters(content, include_metadata=True)
+        assert params["a"]["type"] == "string" and params["a"]["defaultValue"] == "x"
+        assert params["b"]["type"] == "int" and params["b"]["defaultValue"] == 5
+        assert params["a"]["metadata"]["description"] == ""
+        assert params["c"]["type"] == "securestring"
+        assert params["d"]["metadata"]["description"] == "kept across @allowed"
+        assert params["e"]["defaultValue"] == "x=y"
+        assert params["f"]["defaultValue"] == "multi"
+
+    def test_bicep_same_line_and_unbalanced_decorators(self):
+        """Test that decorators sharing the param's line apply to it alone, and brackets in strings are ignored"""
+        from backend.main import parse_bicep_parameters
+        content = "\n".join([
+            "@secure() param adminPassword string",
+            "@description('x') param name string = 'y'",
+            "param d string",
+            "@description('Allowed values (see docs')",
+            "param e int = 1",
+            "@description('It\\'s [odd')",
+            "param f bool = true",
+        ])
+        params = parse_bicep_parameters(content, include_metadata=True)
+        assert list(params) == ["adminPassword", "name", "d", "e", "f"]
+        assert params["adminPassword"]["type"] == "securestring"
+        assert params["name"]["defaultValue"] == "y" and params["name"]["metadata"]["description"] == "x"
+        assert params["d"]["type"] == "string" and params["d"]["metadata"]["description"] == ""
+        assert params["e"]["defaultValue"] == 1
+        assert params["e"]["metadata"]["description"] == "Allowed values (see docs"
+        assert params["f"]["metadata"]["description"] == "It's [odd"
+        # An unclosed decorator stops at the next param instead of hiding the rest
+        params = parse_bicep_parameters("@allowed([\n  'A'\nparam g string\nparam h int", include_metadata=True)
+        assert list(params) == ["g", "h"]
+    
     def test_static_files_exist(self):
         """Test that required static files exist"""
-        frontend_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend")
+        frontend_dir = FRONTEND_DIR
         
         # Check main files exist
         assert os.path.exists(os.path.join(frontend_dir, "index.html"))
@@ -31,7 +120,7 @@ class TestAzureResourceManagerPortal:
         
     def test_javascript_syntax(self):
         """Test that JavaScript files have valid syntax"""
-        frontend_js_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend", "js")
+        frontend_js_dir = os.path.join(FRONTEND_DIR, "js")
         
         js_files = [
             "main.js",
@@ -41,77 +130,68 @@ class TestAzureResourceManagerPortal:
             "resourceGroups.js"
         ]
         
-        for js_file in js_files:
-            file_path = os.path.join(frontend_js_dir, js_file)
-            if os.path.exists(file_path):
-                # Basic syntax check - ensure file can be read and has matching braces
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    
-                # Count braces to check for basic syntax validity
-                open_braces = content.count('{')
-                close_braces = content.count('}')
-                assert open_braces == close_braces, f"Mismatched braces in {js_file}"
-                
-                # Count parentheses
-                open_parens = content.count('(')
-                close_parens = content.count(')')
-                assert open_parens == close_parens, f"Mismatched parentheses in {js_file}"
-                
-                # Ensure no obvious syntax errors
-                assert 'function(' in content or 'function ' in content or '=>' in content, f"No functions found in {js_file}"
-                print(f"✅ {js_file} syntax is valid")
+        # List the directory once instead of checking each file separately; missing files are skipped
+        with os.scandir(frontend_js_dir) as entries:
+            present = {entry.name: entry.path for entry in entries if entry.is_file()}
+        js_files = [js_file for js_file in js_files if js_file in present]
+        
+        # Files are independent, so read and scan them concurrently
+        with ThreadPoolExecutor(max_workers=max(len(js_files), 1)) as executor:
+            results = list(executor.map(_scan_js_file, (present[js_file] for js_file in js_files)))
+        
+        for js_file, (counts, has_function) in zip(js_files, results):
+            assert counts[b'{'] == counts[b'}'], f"Mismatched braces in {js_file}"
+            assert counts[b'('] == counts[b')'], f"Mismatched parentheses in {js_file}"
+            
+            # Ensure no obvious syntax errors
+            assert has_function, f"No functions found in {js_file}"
+            print(f"✅ {js_file} syntax is valid")
                 
     def test_html_structure(self):
         """Test that HTML file has proper structure"""
-        html_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend", "index.html")
+        html_file = os.path.join(FRONTEND_DIR, "index.html")
         
-        with open(html_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
+        with _mapped(html_file) as content:
+            found = {match.group(0).lower() for match in _HTML_TOKENS_RE.finditer(content)}
         # Check for essential HTML structure
-        assert '<html' in content.lower()
-        assert '<head>' in content.lower()
-        assert '<body>' in content.lower()
-        assert '</html>' in content.lower()
+        assert b'<html' in found
+        assert b'<head>' in found
+        assert b'<body>' in found
+        assert b'</html>' in found
         # Check for our app-specific elements
-        assert 'id="mainContent"' in content or 'id=\'mainContent\'' in content
-        assert 'main.js' in content
+        assert b'id="maincontent"' in found or b"id='maincontent'" in found
+        assert b'main.js' in found
         print("✅ HTML structure is valid")
         
     def test_css_file_validity(self):
         """Test that CSS file exists and is not empty"""
-        css_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend", "css", "styles.css")
+        css_file = os.path.join(FRONTEND_DIR, "css", "styles.css")
         
         assert os.path.exists(css_file)
         
-        with open(css_file, 'r', encoding='utf-8') as f:
-            content = f.read().strip()
-            
-        assert len(content) > 0, "CSS file should not be empty"
-        # Basic CSS syntax check
-        assert '{' in content and '}' in content, "CSS file should contain CSS rules"
+        with _mapped(css_file) as content:
+            assert re.search(rb"\S", content), "CSS file should not be empty"
+            # Basic CSS syntax check
+            assert _CSS_RULE_RE.search(content), "CSS file should contain CSS rules"
         print("✅ CSS file is valid")
         
     def test_backend_file_structure(self):
         """Test that backend files exist and have proper structure"""
-        backend_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend")
+        backend_dir = BACKEND_DIR
         # Check main backend files
         assert os.path.exists(os.path.join(backend_dir, "main.py"))
         assert os.path.exists(os.path.join(backend_dir, "utils.py"))
         
         # Check main.py has FastAPI app
         main_file = os.path.join(backend_dir, "main.py")
-        with open(main_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        assert 'FastAPI' in content, "main.py should import FastAPI"
-        assert 'app = FastAPI' in content, "main.py should create FastAPI app instance"
+        with _mapped(main_file) as content:
+            assert content.find(b'FastAPI') != -1, "main.py should import FastAPI"
+            assert content.find(b'app = FastAPI') != -1, "main.py should create FastAPI app instance"
         print("✅ Backend file structure is valid")
         
     def test_project_documentation(self):
         """Test that project has proper documentation"""
-        project_root = os.path.dirname(os.path.dirname(__file__))
+        project_root = PROJECT_ROOT
         
         # Check README exists
         readme_file = os.path.join(project_root, "README.md")
@@ -127,7 +207,7 @@ class TestAzureResourceManagerPortal:
         
     def test_requirements_file(self):
         """Test that requirements.txt exists and has essential dependencies"""
-        requirements_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), "requirements.txt")
+        requirements_file = os.path.join(PROJECT_ROOT, "requirements.txt")
         
         if os.path.exists(requirements_file):
             with open(requirements_file, 'r', encoding='utf-8') as f:
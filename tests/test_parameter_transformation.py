@@ -8,6 +8,11 @@ import json
 import requests
 import sys
 
+from helpers import VERBOSE, _pretty
+
+# One keep-alive connection to the local backend for every test in this module
+SESSION = requests.Session()
+
 def test_parameter_transformation():
     """Test the parameter transformation logic with different data types."""
     
@@ -46,11 +51,12 @@ def test_parameter_transformation():
     }
     
     print("Testing parameter transformation...")
-    print(f"Original parameters: {json.dumps(test_payload['parameters'], indent=2)}")
+    if VERBOSE:
+        print(f"Original parameters: {_pretty(test_payload['parameters'])}")
     
     try:
         # Make the API call
-        response = requests.post(
+        response = SESSION.post(
             "http://localhost:8000/deploy",
             json=test_payload,
             timeout=10
@@ -91,10 +97,11 @@ def test_empty_array_handling():
     
     print("\n" + "="*50)
     print("Testing empty value handling...")
-    print(f"Original parameters: {json.dumps(test_payload['parameters'], indent=2)}")
+    if VERBOSE:
+        print(f"Original parameters: {_pretty(test_payload['parameters'])}")
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             "http://localhost:8000/deploy",
             json=test_payload,
             timeout=10